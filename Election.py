@@ -5,7 +5,11 @@ from hedera import (
     ContractFunctionParameters, ContractId
 )
 import os
+import time
 from dotenv import load_dotenv
+from tx_journal import get_journal, record_transaction
+from gas_profiler import execute_with_gas_retry
+from operator_pool import OperatorPool
 
 load_dotenv()
 
@@ -27,6 +31,9 @@ class HederaManager:
                 g.hedera_client = None
         return g.hedera_client
 
+# Payer accounts for contract executions, shared by all requests
+operator_pool = OperatorPool.from_env()
+
 # Election Contract Interface
 class ElectionContract:
     CONTRACT_ID = None  # Set after deployment
@@ -42,35 +49,47 @@ class ElectionContract:
         cls.CONTRACT_ID = receipt.contractId
         return cls.CONTRACT_ID
 
+    @classmethod
+    def _execute(cls, client, function_name, params, journal_params, voter=None):
+        # Every submission is journaled with its status and latency
+        voter = voter or str(client.getOperatorAccountId())
+
+        def submit(gas):
+            tx_id = None
+            start = time.perf_counter()
+            try:
+                tx = (ContractExecuteTransaction()
+                     .setContractId(cls.CONTRACT_ID)
+                     .setGas(gas)
+                     .setFunction(function_name, params)
+                     .execute(client))
+                tx_id = tx.transactionId.toString()
+                receipt = tx.getReceipt(client)
+            except Exception as e:
+                record_transaction(function_name, journal_params, voter, tx_id,
+                                   f"FAILED: {str(e)}"[:200], (time.perf_counter() - start) * 1000)
+                raise
+            record_transaction(function_name, journal_params, voter, tx_id,
+                               receipt.status.toString(), (time.perf_counter() - start) * 1000)
+            return tx, receipt
+
+        return execute_with_gas_retry(function_name, 100000, submit, client)
+
     @classmethod
     def add_candidate(cls, client, name):
-        tx = (ContractExecuteTransaction()
-             .setContractId(cls.CONTRACT_ID)
-             .setGas(100000)
-             .setFunction("addCandidate", 
-                 ContractFunctionParameters().addString(name))
-             .execute(client))
-        return tx.getReceipt(client)
+        return cls._execute(client, "addCandidate",
+            ContractFunctionParameters().addString(name), [name])
 
     @classmethod
     def register_voter(cls, client, voter_address):
-        tx = (ContractExecuteTransaction()
-             .setContractId(cls.CONTRACT_ID)
-             .setGas(100000)
-             .setFunction("registerVoter",
-                 ContractFunctionParameters().addAddress(voter_address))
-             .execute(client))
-        return tx.getReceipt(client)
+        return cls._execute(client, "registerVoter",
+            ContractFunctionParameters().addAddress(voter_address), [voter_address],
+            voter=voter_address)
 
     @classmethod
     def vote(cls, client, candidate_id):
-        tx = (ContractExecuteTransaction()
-             .setContractId(cls.CONTRACT_ID)
-             .setGas(100000)
-             .setFunction("vote",
-                 ContractFunctionParameters().addUint256(candidate_id))
-             .execute(client))
-        return tx.getReceipt(client)
+        return cls._execute(client, "vote",
+            ContractFunctionParameters().addUint256(candidate_id), [candidate_id])
 
     @classmethod
     def get_winner(cls, client):
@@ -120,10 +139,10 @@ def deploy_contract():
 
 @app.route("/election/add_candidate", methods=["POST"])
 def add_candidate():
-    client = HederaManager.get_client()
     data = request.get_json()
     
-    receipt = ElectionContract.add_candidate(client, data["name"])
+    receipt = operator_pool.submit(
+        lambda client, operator: ElectionContract.add_candidate(client, data["name"]))
     return jsonify({
         "status": "success",
         "tx_id": str(receipt.transactionId),
@@ -132,10 +151,10 @@ def add_candidate():
 
 @app.route("/election/register", methods=["POST"])
 def register_voter():
-    client = HederaManager.get_client()
     data = request.get_json()
     
-    receipt = ElectionContract.register_voter(client, data["voter_address"])
+    receipt = operator_pool.submit(
+        lambda client, operator: ElectionContract.register_voter(client, data["voter_address"]))
     return jsonify({
         "status": "success",
         "tx_id": str(receipt.transactionId),
@@ -144,16 +163,36 @@ def register_voter():
 
 @app.route("/election/vote", methods=["POST"])
 def submit_vote():
-    client = HederaManager.get_client()
     data = request.get_json()
     
-    receipt = ElectionContract.vote(client, data["candidate_id"])
+    receipt = operator_pool.submit(
+        lambda client, operator: ElectionContract.vote(client, data["candidate_id"]))
     return jsonify({
         "status": "success",
         "tx_id": str(receipt.transactionId),
         "candidate_id": data["candidate_id"]
     })
 
+@app.route("/election/tx")
+def transaction_lookup():
+    tx_id = request.args.get("tx_id")
+    voter = request.args.get("voter")
+    if not tx_id and not voter:
+        return jsonify({"error": "tx_id or voter required"}), 400
+
+    journal = get_journal()
+    if tx_id:
+        record = journal.get(tx_id)
+        if not record:
+            return jsonify({"error": "Transaction not found"}), 404
+        return jsonify(record)
+
+    limit = max(1, min(request.args.get("limit", 100, type=int), 1000))
+    return jsonify({
+        "voter": voter,
+        "transactions": journal.by_voter(voter, limit)
+    })
+
 @app.route("/election/results")
 def get_results():
     client = HederaManager.get_client()
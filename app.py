@@ -1,31 +1,34 @@
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, jsonify, request, render_template, Response
 from web3 import Web3
 import os
 from flask_cors import CORS
 from dotenv import load_dotenv
 import datetime
+from collections import deque
+from web3.exceptions import TimeExhausted
+from gas_profiler import profiler as gas_profiler
+from recount import recount
+from export_events import stream_votes
 
 import pytest
-from web3 import Web3
-
-# Make sure your Web3 provider is correctly set
-INFURA_URL = "https://sepolia.infura.io/v3/6a7c89a931f74fad9856958a1b69158b"  # Replace with Infura or Hashio RPC URL
-web3 = Web3(Web3.HTTPProvider(INFURA_URL))
-
-if not web3.is_connected():
-    print("⚠️  Web3 is NOT connected! Check your RPC URL.")
-else:
-    print("✅ Web3 Connected Successfully!")
+from rpc_router import ProviderRouter
+from tally_snapshot import read_snapshot
+from sampling_profiler import register_profiler
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+register_profiler(app)
 
-# Initialize Web3
+# Initialize Web3: RPC_URLS is a comma separated list of nodes on the same
+# chain as RPC_URL; the first one takes writes. Set RPC_CHAIN_ID to pin the
+# expected chain instead of trusting the first node that answers
 RPC_URL = os.getenv("RPC_URL")
-web3 = Web3(Web3.HTTPProvider(RPC_URL))
+RPC_URLS = [u.strip() for u in os.getenv("RPC_URLS", RPC_URL or "").split(",") if u.strip()]
+router = ProviderRouter(RPC_URLS)
+web3 = router.web3
 CONTRACT_ADDRESS = os.getenv("ELECTION_CONTRACT_ADDRESS")
 
 
@@ -223,11 +226,27 @@ ABI = [
 	}
 ]
 
-# Initialize contract
-contract = web3.eth.contract(
-    address=Web3.to_checksum_address(CONTRACT_ADDRESS),
-    abi=ABI
-)
+# Initialize contract on every provider; `contract` is the pinned one
+contract = router.bind_contract(Web3.to_checksum_address(CONTRACT_ADDRESS), ABI)
+
+def fetch_candidates(contract):
+    candidates = []
+    total_candidates = contract.functions.candidatesCount().call()
+    for candidate_id in range(1, total_candidates + 1):
+        name, votes = contract.functions.getCandidate(candidate_id).call()
+        candidates.append({
+            'id': candidate_id,
+            'name': name,
+            'votes': votes
+        })
+    return candidates
+
+def current_candidates():
+    """Tally from the shared-memory snapshot, or from the chain if there is none"""
+    snapshot = read_snapshot()
+    if snapshot is not None:
+        return snapshot["candidates"]
+    return router.read(lambda w3, c: fetch_candidates(c))
 
 @app.route("/")
 def home():
@@ -239,17 +258,8 @@ def results():
 @app.route('/results/data')
 def results_data():
     try:
-        candidates = []
-        total_candidates = contract.functions.candidatesCount().call()
-        
         # Get all candidates with their vote counts
-        for candidate_id in range(1, total_candidates + 1):
-            name, votes = contract.functions.getCandidate(candidate_id).call()
-            candidates.append({
-                'id': candidate_id,
-                'name': name,
-                'votes': votes
-            })
+        candidates = current_candidates()
         
         # Determine winner(s) - handles ties
         max_votes = max(c['votes'] for c in candidates)
@@ -273,15 +283,7 @@ def results_data():
 @app.route("/candidates", methods=["GET"])
 def get_candidates():
     try:
-        candidates = []
-        total_candidates = contract.functions.candidatesCount().call()
-        for i in range(1, total_candidates + 1):
-            name, votes = contract.functions.getCandidate(i).call()
-            candidates.append({
-                "id": i,
-                "name": name,
-                "votes": votes
-            })
+        candidates = current_candidates()
         return jsonify(candidates)
     except Exception as e:
         app.logger.error(f"Error getting candidates: {str(e)}")
@@ -295,7 +297,8 @@ def has_voted():
     checksum_address = Web3.to_checksum_address(address)
     
     try:
-        has_voted, voted_candidate_id = contract.functions.voters(checksum_address).call()
+        has_voted, voted_candidate_id = router.read(
+            lambda w3, c: c.functions.voters(checksum_address).call())
         if has_voted:
             return jsonify({
                 "hasVoted": True,
@@ -350,7 +353,7 @@ def vote():
 
             # Check if already voted
             try:
-                has_voted = contract.functions.voters(checksum_address).call()[0]
+                has_voted = router.read(lambda w3, c: c.functions.voters(checksum_address).call())[0]
                 if has_voted:
                     return jsonify({"error": "You have already voted"}), 400
             except Exception as e:
@@ -361,7 +364,7 @@ def vote():
             try:
                 txn_data = contract.functions.vote(candidate_id).build_transaction({
                     'from': checksum_address,
-                    'gas': 200000,  # Fixed gas or estimate properly
+                    'gas': gas_profiler.gas_limit('vote', 200000),  # p99 of observed receipts
                     'gasPrice': web3.eth.gas_price,
                     'nonce': web3.eth.get_transaction_count(checksum_address),
                 })
@@ -447,10 +450,106 @@ def vote():
             app.logger.error(f"Voting error: {str(e)}")
             return jsonify({"error": "Internal server error"}), 500
 
+VOTE_SELECTOR = Web3.keccak(text="vote(uint256)")[:4]
+CONFIRMED_HASHES = deque(maxlen=10000)  # each receipt is sampled once
+
+@app.route("/vote/confirm", methods=["POST"])
+def confirm_vote():
+    """Frontend reports the signed tx hash; the receipt feeds the gas profiler"""
+    data = request.get_json(silent=True) or {}
+    txn_hash = data.get("txn_hash")
+    if not txn_hash or not isinstance(txn_hash, str):
+        return jsonify({"error": "Missing txn_hash"}), 400
+
+    try:
+        receipt = web3.eth.wait_for_transaction_receipt(txn_hash, timeout=3, poll_latency=0.5)
+    except TimeExhausted:
+        return jsonify({"status": "pending"}), 202
+    except Exception as e:
+        app.logger.error(f"Receipt lookup failed: {str(e)}")
+        return jsonify({"error": "Failed to fetch receipt", "details": str(e)}), 500
+
+    try:
+        txn = web3.eth.get_transaction(txn_hash)
+        txn_input = txn["input"]
+        txn_input = Web3.to_bytes(hexstr=txn_input) if isinstance(txn_input, str) else bytes(txn_input)
+    except Exception as e:
+        app.logger.error(f"Transaction lookup failed: {str(e)}")
+        return jsonify({"error": "Failed to fetch transaction", "details": str(e)}), 500
+
+    # Only successful vote() calls on this contract say anything about vote gas
+    if receipt.to is None or Web3.to_checksum_address(receipt.to) != contract.address:
+        return jsonify({"error": "Not an election contract transaction"}), 400
+    if txn_input[:4] != VOTE_SELECTOR:
+        return jsonify({"error": "Not a vote transaction"}), 400
+
+    if receipt.status == 1 and txn_hash.lower() not in CONFIRMED_HASHES:
+        CONFIRMED_HASHES.append(txn_hash.lower())
+        gas_profiler.record("vote", receipt.gasUsed)
+    return jsonify({
+        "status": "success" if receipt.status == 1 else "reverted",
+        "block": receipt.blockNumber,
+        "gasUsed": receipt.gasUsed
+    })
+
+@app.route("/gas/report", methods=["GET"])
+def gas_report():
+    gas_price = request.args.get("gas_price", type=float)
+    min_charge = request.args.get("min_charge", default=0.8, type=float)
+    return jsonify(gas_profiler.report(gas_price=gas_price, min_charge=min_charge))
+
+@app.route("/recount", methods=["GET"])
+def recount_votes():
+    """Recount from Voted events and diff against the contract's totals"""
+    from_block = request.args.get("from_block", default=int(os.getenv("ELECTION_START_BLOCK", "0")), type=int)
+    to_block = request.args.get("to_block", default="latest")
+    chunk_size = request.args.get("chunk_size", default=5000, type=int)
+    try:
+        if to_block != "latest":
+            to_block = int(to_block)
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid block range"}), 400
+
+    try:
+        report = recount(web3, contract, from_block, to_block, chunk_size)
+        return jsonify({"success": True, **report})
+    except Exception as e:
+        app.logger.error(f"Recount failed: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Recount failed',
+            'details': str(e)
+        }), 500
+
+@app.route("/export/votes.arrow", methods=["GET"])
+def export_votes():
+    """Stream the Voted history as an Arrow IPC stream, batch by batch"""
+    try:
+        from_block = request.args.get("from_block", default=int(os.getenv("ELECTION_START_BLOCK", "0")), type=int)
+        to_block = request.args.get("to_block", default="latest")
+        if to_block != "latest":
+            to_block = int(to_block)
+    except ValueError:
+        return jsonify({"error": "Invalid block range"}), 400
+
+    return Response(
+        stream_votes(web3, contract, from_block, to_block),
+        mimetype="application/vnd.apache.arrow.stream",
+        headers={"Content-Disposition": "attachment; filename=votes.arrow"}
+    )
+
+@app.route("/rpc/stats", methods=["GET"])
+def rpc_stats():
+    return jsonify(router.stats())
+
 @app.route("/winner", methods=["GET"])
 def get_winner():
     try:
-        name, votes = contract.functions.getWinner().call()
+        snapshot = read_snapshot()
+        if snapshot is not None and snapshot["winner"] is not None:
+            name, votes = snapshot["winner"]["name"], snapshot["winner"]["votes"]
+        else:
+            name, votes = router.read(lambda w3, c: c.functions.getWinner().call())
         return jsonify({
             "winner": name,
             "votes": votes
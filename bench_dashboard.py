@@ -0,0 +1,62 @@
+"""Benchmark: /election dashboard latency, sequential vs parallel queries.
+
+Uses a local stand-in for ContractCallQuery that just sleeps for the
+configured round-trip latency, so it runs without a Hedera network:
+
+    python bench_dashboard.py --latency 0.05 --sizes 5 10 20 50
+"""
+import time
+import argparse
+from query_executor import ParallelQueryExecutor
+
+
+def make_stand_in(latency):
+    def stand_in_query(function_name, params, node, **kwargs):
+        time.sleep(latency)
+        return (function_name, params, node)
+    return stand_in_query
+
+
+def sequential_dashboard(query, count):
+    query("candidatesCount", None, None)
+    for i in range(1, count + 1):
+        query("getCandidate", i, None)
+    query("getWinner", None, None)
+
+
+def parallel_dashboard(executor, count):
+    executor.run_one("candidatesCount")
+    queries = [("getCandidate", i) for i in range(1, count + 1)]
+    queries.append(("getWinner", None))
+    executor.run(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per query round trip")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 20, 50, 100])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--nodes", nargs="*", default=["0.0.3", "0.0.4", "0.0.5"])
+    args = parser.parse_args()
+
+    query = make_stand_in(args.latency)
+    executor = ParallelQueryExecutor(query, nodes=args.nodes, max_workers=args.workers, timeout=60)
+
+    print(f"latency={args.latency * 1000:.0f}ms workers={args.workers} nodes={len(args.nodes)}")
+    print(f"{'N':>5} {'sequential':>12} {'parallel':>12} {'speedup':>8}")
+    for n in args.sizes:
+        start = time.perf_counter()
+        sequential_dashboard(query, n)
+        seq = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel_dashboard(executor, n)
+        par = time.perf_counter() - start
+
+        print(f"{n:>5} {seq * 1000:>10.0f}ms {par * 1000:>10.0f}ms {seq / par:>7.1f}x")
+
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
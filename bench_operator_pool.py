@@ -0,0 +1,81 @@
+"""Benchmark: vote submission throughput with 1..N Hedera operators.
+
+The stand-in ledger serializes transactions per payer account (one client,
+one operator) and takes `--latency` seconds per submit+receipt round trip.
+One operator is low on balance and one fails prechecks with BUSY at
+`--busy-rate`, to show balance-aware routing and failover:
+
+    python bench_operator_pool.py --votes 400 --latency 0.02 --operators 1 2 4 8
+"""
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator_pool import Operator, OperatorPool
+
+
+class StandInLedger:
+    def __init__(self, latency, busy_rate):
+        self.latency = latency
+        self.busy_rate = busy_rate
+        self.payer_locks = {}
+        self.executed = 0
+        self._lock = threading.Lock()
+
+    def client(self, account_id):
+        self.payer_locks[account_id] = threading.Lock()
+        return account_id
+
+    def balance(self, client, account_id):
+        return 10 ** 8 if account_id.endswith("poor") else 10 ** 12
+
+    def vote(self, client, operator):
+        if operator.account_id.endswith("flaky") and random.random() < self.busy_rate:
+            raise RuntimeError("PrecheckStatusException: BUSY")
+        with self.payer_locks[client]:
+            time.sleep(self.latency)
+        with self._lock:
+            self.executed += 1
+        return operator.account_id
+
+
+def run(count, votes, latency, busy_rate, submitters):
+    ledger = StandInLedger(latency, busy_rate)
+    ids = [f"0.0.{1000 + i}" for i in range(count)]
+    if count >= 3:
+        ids[-1] += "-poor"
+        ids[-2] += "-flaky"
+    operators = [Operator(account_id, ledger.client(account_id)) for account_id in ids]
+    pool = OperatorPool(operators, balance_fn=ledger.balance, min_balance=5 * 10 ** 8, cooldown=0.05)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=submitters) as executor:
+        list(executor.map(lambda _: pool.submit(ledger.vote), range(votes)))
+    elapsed = time.perf_counter() - start
+    pool.close()
+    assert ledger.executed == votes
+    return votes / elapsed, pool.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--votes", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--busy-rate", type=float, default=0.05)
+    parser.add_argument("--submitters", type=int, default=64)
+    parser.add_argument("--operators", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"votes={args.votes} latency={args.latency * 1000:.0f}ms submitters={args.submitters}")
+    baseline = None
+    for count in args.operators:
+        throughput, stats = run(count, args.votes, args.latency, args.busy_rate, args.submitters)
+        baseline = baseline or throughput
+        print(f"{count:>3} operators: {throughput:8.1f} votes/s ({throughput / baseline:4.1f}x)")
+        for op in stats:
+            print(f"      {op['account_id']:<16} submitted={op['submitted']:<5} failed={op['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Columnar export of the election's event history and tally.
+
+Streams Voted and CandidateAdded logs block range by block range into
+Parquet (or Arrow IPC) part files, then rewrites the current tally.
+Each run continues from the last exported block, so re-running it only
+appends what is new:
+
+    python export_events.py --out exports --format parquet
+
+Load the result with `pandas.read_parquet("exports/votes")` or
+`pyarrow.dataset.dataset("exports/votes")`.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from eth_abi import decode as abi_decode
+
+from recount import (
+    RECOUNT_CHUNK_BLOCKS, VOTED_SIGNATURE, event_topic, iter_log_chunks,
+    voted_words, decode_voted_words,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_ROW_GROUP_ROWS = int(os.getenv("EXPORT_ROW_GROUP_ROWS", "262144"))
+CANDIDATE_ADDED_SIGNATURE = "CandidateAdded(uint256,string)"
+UNKNOWN_CANDIDATE = "<unknown>"
+
+CANDIDATE_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+VOTES_SCHEMA = pa.schema([
+    ("block_number", pa.int64()),
+    ("log_index", pa.int32()),
+    ("tx_hash", pa.binary(32)),
+    ("voter", pa.binary(20)),
+    ("candidate_id", pa.int64()),
+    ("candidate", CANDIDATE_TYPE),
+])
+
+CANDIDATES_SCHEMA = pa.schema([
+    ("block_number", pa.int64()),
+    ("log_index", pa.int32()),
+    ("tx_hash", pa.binary(32)),
+    ("candidate_id", pa.int64()),
+    ("name", pa.string()),
+])
+
+TALLY_SCHEMA = pa.schema([
+    ("candidate_id", pa.int64()),
+    ("candidate", CANDIDATE_TYPE),
+    ("votes", pa.int64()),
+    ("block_number", pa.int64()),
+])
+
+
+# --------------------------
+# Record batches
+# --------------------------
+
+def _fixed_binary(values, width):
+    """FixedSizeBinaryArray from a contiguous `(n, width)` uint8 array"""
+    data = np.ascontiguousarray(values, dtype=np.uint8)
+    return pa.FixedSizeBinaryArray.from_buffers(pa.binary(width), len(data), [None, pa.py_buffer(data.tobytes())])
+
+
+def _log_columns(logs):
+    blocks = pa.array([log["blockNumber"] for log in logs], pa.int64())
+    indexes = pa.array([log["logIndex"] for log in logs], pa.int32())
+    tx_hashes = pa.array([bytes(log["transactionHash"]) for log in logs], pa.binary(32))
+    return blocks, indexes, tx_hashes
+
+
+def votes_batch(logs, names):
+    """Voted logs as one record batch; `names` is the candidate dictionary by id"""
+    words = voted_words(logs)
+    _, candidate_ids, valid = decode_voted_words(words)
+    known = valid & (candidate_ids > 0) & (candidate_ids < len(names))
+    indices = pa.array(np.where(known, candidate_ids, 0).astype(np.int32))
+    blocks, log_indexes, tx_hashes = _log_columns(logs)
+    return pa.RecordBatch.from_arrays([
+        blocks,
+        log_indexes,
+        tx_hashes,
+        _fixed_binary(words[:, 12:32], 20),
+        pa.array(candidate_ids),
+        pa.DictionaryArray.from_arrays(indices, names),
+    ], schema=VOTES_SCHEMA)
+
+
+def candidates_batch(logs):
+    ids, names = [], []
+    for log in logs:
+        candidate_id, name = abi_decode(["uint256", "string"], bytes(log["data"]))
+        ids.append(candidate_id)
+        names.append(name)
+    blocks, log_indexes, tx_hashes = _log_columns(logs)
+    return pa.RecordBatch.from_arrays(
+        [blocks, log_indexes, tx_hashes, pa.array(ids, pa.int64()), pa.array(names, pa.string())],
+        schema=CANDIDATES_SCHEMA)
+
+
+def candidate_names(contract, block_identifier="latest"):
+    """Dictionary of candidate names indexed by id; index 0 is for unknown ids"""
+    count = contract.functions.candidatesCount().call(block_identifier=block_identifier)
+    names = [UNKNOWN_CANDIDATE]
+    votes = [0]
+    for candidate_id in range(1, count + 1):
+        name, vote_count = contract.functions.getCandidate(candidate_id).call(block_identifier=block_identifier)
+        names.append(name)
+        votes.append(vote_count)
+    return pa.array(names, pa.string()), votes
+
+
+def iter_batches(web3, contract, from_block, to_block, names, chunk_size=RECOUNT_CHUNK_BLOCKS):
+    """Yield `(kind, end_block, batch)` with kind "votes" or "candidates"""
+    voted = event_topic(VOTED_SIGNATURE)
+    added = event_topic(CANDIDATE_ADDED_SIGNATURE)
+    for _, end, logs in iter_log_chunks(web3, contract.address, [voted, added],
+                                        from_block, to_block, chunk_size):
+        vote_logs = [log for log in logs if log["topics"][0] == voted]
+        added_logs = [log for log in logs if log["topics"][0] == added]
+        if vote_logs:
+            yield "votes", end, votes_batch(vote_logs, names)
+        if added_logs:
+            yield "candidates", end, candidates_batch(added_logs)
+
+
+# --------------------------
+# File writers
+# --------------------------
+
+def _tmp_path(path):
+    """Sibling temp file that pyarrow.dataset skips (it ignores "_" and "." prefixes)"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f"_{name}.tmp")
+
+
+class _RowGroupWriter:
+    """Buffers batches and writes one row group per EXPORT_ROW_GROUP_ROWS rows"""
+
+    def __init__(self, path, schema, fmt):
+        self.path = path
+        self.tmp_path = _tmp_path(path)
+        self.schema = schema
+        self.fmt = fmt
+        self.writer = None
+        self.pending = []
+        self.pending_rows = 0
+        self.rows = 0
+
+    def _open(self):
+        if self.fmt == "parquet":
+            self.writer = pq.ParquetWriter(self.tmp_path, self.schema, compression="zstd")
+        else:
+            options = pa.ipc.IpcWriteOptions(compression="zstd")
+            self.writer = pa.ipc.new_file(self.tmp_path, self.schema, options=options)
+
+    def write(self, batch):
+        self.pending.append(batch)
+        self.pending_rows += batch.num_rows
+        if self.pending_rows >= EXPORT_ROW_GROUP_ROWS:
+            self.flush(final=False)
+
+    def flush(self, final=True):
+        """Write full row groups; the remainder waits unless `final`"""
+        if not self.pending_rows:
+            return
+        table = pa.Table.from_batches(self.pending, schema=self.schema)
+        rows = self.pending_rows if final else self.pending_rows - self.pending_rows % EXPORT_ROW_GROUP_ROWS
+        self.pending = table.slice(rows).to_batches()
+        self.pending_rows -= rows
+        if self.writer is None:
+            self._open()
+        if self.fmt == "parquet":
+            self.writer.write_table(table.slice(0, rows), row_group_size=EXPORT_ROW_GROUP_ROWS)
+        else:
+            self.writer.write_table(table.slice(0, rows), max_chunksize=EXPORT_ROW_GROUP_ROWS)
+        self.rows += rows
+
+    def close(self):
+        """Finish the part file; nothing is left behind when it had no rows"""
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            os.replace(self.tmp_path, self.path)
+        return self.rows
+
+
+def _write_table(path, table, fmt):
+    tmp_path = _tmp_path(path)
+    if fmt == "parquet":
+        pq.write_table(table, tmp_path, compression="zstd")
+    else:
+        with pa.ipc.new_file(tmp_path, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+# --------------------------
+# Incremental export
+# --------------------------
+
+def _load_state(out_dir):
+    try:
+        with open(os.path.join(out_dir, "_state.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_state(out_dir, state):
+    path = os.path.join(out_dir, "_state.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def export(web3, contract, out_dir=EXPORT_DIR, fmt="parquet", from_block=None, to_block="latest",
+           chunk_size=RECOUNT_CHUNK_BLOCKS):
+    """Export everything after the last exported block; returns a summary"""
+    ext = "parquet" if fmt == "parquet" else "arrow"
+    state = _load_state(out_dir)
+    if from_block is None:
+        from_block = state.get("last_block", int(os.getenv("ELECTION_START_BLOCK", "0")) - 1) + 1
+    if to_block == "latest":
+        to_block = web3.eth.block_number
+    if from_block > to_block:
+        return {"from_block": from_block, "to_block": to_block, "votes": 0, "candidates": 0}
+
+    for kind in ("votes", "candidates"):
+        os.makedirs(os.path.join(out_dir, kind), exist_ok=True)
+    part = f"part-{from_block:012d}-{to_block:012d}.{ext}"
+    writers = {
+        "votes": _RowGroupWriter(os.path.join(out_dir, "votes", part), VOTES_SCHEMA, fmt),
+        "candidates": _RowGroupWriter(os.path.join(out_dir, "candidates", part), CANDIDATES_SCHEMA, fmt),
+    }
+
+    names, on_chain_votes = candidate_names(contract, to_block)
+    for kind, _, batch in iter_batches(web3, contract, from_block, to_block, names, chunk_size):
+        writers[kind].write(batch)
+    rows = {kind: writer.close() for kind, writer in writers.items()}
+
+    ids = np.arange(1, len(names), dtype=np.int64)
+    tally = pa.Table.from_arrays([
+        pa.array(ids),
+        pa.DictionaryArray.from_arrays(pa.array(ids.astype(np.int32)), names),
+        pa.array(on_chain_votes[1:], pa.int64()),
+        pa.array(np.full(len(ids), to_block, dtype=np.int64)),
+    ], schema=TALLY_SCHEMA)
+    _write_table(os.path.join(out_dir, f"tally.{ext}"), tally, fmt)
+
+    _save_state(out_dir, {"last_block": to_block, "format": fmt})
+    logger.info(f"📦 Exported blocks {from_block}-{to_block}: {rows['votes']} votes, {rows['candidates']} candidates")
+    return {"from_block": from_block, "to_block": to_block, **rows}
+
+
+class _ChunkSink:
+    """File-like target that hands every write back to a generator"""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def stream_votes(web3, contract, from_block, to_block, chunk_size=RECOUNT_CHUNK_BLOCKS):
+    """Yield the Voted history as an Arrow IPC stream, one batch at a time"""
+    if to_block == "latest":
+        to_block = web3.eth.block_number
+    names, _ = candidate_names(contract, to_block)
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), VOTES_SCHEMA)
+    yield sink.drain()
+    for kind, _, batch in iter_batches(web3, contract, from_block, to_block, names, chunk_size):
+        if kind == "votes":
+            writer.write_batch(batch)
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export election events to Parquet/Arrow")
+    parser.add_argument("--out", default=EXPORT_DIR)
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--from-block", type=int, default=None, help="default: after the last export")
+    parser.add_argument("--to-block", default="latest")
+    parser.add_argument("--chunk-size", type=int, default=RECOUNT_CHUNK_BLOCKS)
+    args = parser.parse_args()
+
+    from app import web3, contract
+
+    to_block = args.to_block if args.to_block == "latest" else int(args.to_block)
+    summary = export(web3, contract, args.out, args.format, args.from_block, to_block, args.chunk_size)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    sys.exit(main())
@@ -7,9 +7,15 @@ from hedera import (
 import os
 import logging
 import json
+import time
 from functools import wraps
 from dotenv import load_dotenv
 import jpype
+from query_executor import ParallelQueryExecutor
+from tx_journal import get_journal, record_transaction
+from gas_profiler import profiler as gas_profiler, execute_with_gas_retry
+from sampling_profiler import register_profiler
+from operator_pool import OperatorPool
 
 # --------------------------
 # Initial Setup
@@ -24,6 +30,7 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask
 app = Flask(__name__)
+register_profiler(app)
 
 # --------------------------
 # Hedera Configuration
@@ -97,40 +104,68 @@ class HederaManager:
             
         return ContractId.fromString(contract_id)
 
+# Payer accounts for contract executions (HEDERA_OPERATORS, or the single operator)
+operator_pool = OperatorPool.from_env()
+
 # --------------------------
 # Contract Interaction
 # --------------------------
 
-def execute_contract_function(function_name, params=None):
-    """Execute a contract function with error handling"""
+def execute_contract_function(function_name, params=None, journal_params=None, voter=None):
+    """Execute a contract function with error handling.
+
+    The submission goes to the operator pool, which picks the payer
+    account. `journal_params` are the plain Python arguments recorded in
+    the transaction journal; `voter` defaults to the paying operator.
+    """
+    def attempt(client, operator):
+        payer_voter = voter or operator.account_id
+
+        def submit(gas):
+            tx_id = None
+            start = time.perf_counter()
+            try:
+                tx = (ContractExecuteTransaction()
+                     .setContractId(contract_id)
+                     .setGas(gas)
+                     .setFunction(function_name, params or ContractFunctionParameters())
+                     .execute(client))
+                tx_id = tx.transactionId.toString()
+
+                receipt = tx.getReceipt(client)
+            except Exception as e:
+                record_transaction(function_name, journal_params, payer_voter, tx_id,
+                                   f"FAILED: {str(e)}"[:200], (time.perf_counter() - start) * 1000)
+                raise
+
+            logger.info(f"📝 {function_name} TX: {receipt.transactionId.toString()} (payer {operator.account_id})")
+            record_transaction(function_name, journal_params, payer_voter, tx_id,
+                               receipt.status.toString(), (time.perf_counter() - start) * 1000)
+            return tx, receipt
+
+        return execute_with_gas_retry(function_name, 1000000, submit, client)
+
     try:
-        client = HederaManager.get_client()
         contract_id = HederaManager.get_contract()
-        
-        tx = (ContractExecuteTransaction()
-             .setContractId(contract_id)
-             .setGas(1000000)
-             .setFunction(function_name, params or ContractFunctionParameters())
-             .execute(client))
-        
-        receipt = tx.getReceipt(client)
-        logger.info(f"📝 {function_name} TX: {receipt.transactionId.toString()}")
-        return receipt
+        return operator_pool.submit(attempt)
         
     except Exception as e:
         logger.error(f"❌ Contract execution failed: {str(e)}")
         raise
 
-def query_contract(function_name, params=None):
+def query_contract(function_name, params=None, node_id=None, client=None):
     """Query contract state with error handling"""
     try:
-        client = HederaManager.get_client()
+        # Worker threads have no Flask `g`, so they pass the client in
+        client = client or HederaManager.get_client()
         contract_id = HederaManager.get_contract()
         
         query = (ContractCallQuery()
                 .setContractId(contract_id)
                 .setGas(100000)
                 .setFunction(function_name, params or ContractFunctionParameters()))
+        if node_id:
+            query.setNodeAccountIds([AccountId.fromString(node_id)])
         
         return query.execute(client)
         
@@ -138,25 +173,45 @@ def query_contract(function_name, params=None):
         logger.error(f"❌ Contract query failed: {str(e)}")
         raise
 
+# Shared by all requests; nodes/workers/timeout come from HEDERA_QUERY_* env vars
+query_executor = ParallelQueryExecutor(query_contract)
+
 # --------------------------
 # Flask Routes
 # --------------------------
 
+def handle_hedera_errors(f):
+    """Turn uncaught Hedera/JVM errors into a JSON 500 instead of an HTML page"""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        try:
+            return f(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"❌ {f.__name__} failed: {str(e)}")
+            return jsonify({"error": f"❌ {str(e)}"}), 500
+    return wrapper
+
 @app.route("/election")
 @handle_hedera_errors
 def election_dashboard():
     """Main election dashboard"""
     candidates = []
     try:
-        count = query_contract("candidatesCount").getUint256(0)
-        for i in range(1, count + 1):
-            name, votes = query_contract(
-                "getCandidate",
-                ContractFunctionParameters().addUint256(i)
-            )
-            candidates.append({"id": i, "name": name, "votes": votes})
+        client = HederaManager.get_client()
+        count = query_executor.run_one("candidatesCount", client=client).getUint256(0)
+
+        # getCandidate for every id plus getWinner, all in flight at once
+        queries = [
+            ("getCandidate", ContractFunctionParameters().addUint256(i))
+            for i in range(1, count + 1)
+        ]
+        queries.append(("getWinner", None))
+        *results, winner = query_executor.run(queries, client=client)
+
+        for i, result in enumerate(results, start=1):
+            candidates.append({"id": i, "name": result.getString(0), "votes": result.getUint256(1)})
         
-        winner_name, winner_votes = query_contract("getWinner")
+        winner_name, winner_votes = winner.getString(0), winner.getUint256(1)
         
         return render_template("election.html",
                             candidates=candidates,
@@ -178,7 +233,8 @@ def vote():
     try:
         receipt = execute_contract_function(
             "vote",
-            ContractFunctionParameters().addUint256(int(data["candidate_id"]))
+            ContractFunctionParameters().addUint256(int(data["candidate_id"])),
+            journal_params=[int(data["candidate_id"])])
         
         return jsonify({
             "status": "✅ Vote recorded",
@@ -190,6 +246,25 @@ def vote():
         logger.error(f"❌ Vote failed: {str(e)}")
         return jsonify({"error": f"❌ {str(e)}"}), 500
 
+@app.route("/election/tx")
+@handle_hedera_errors
+def transaction_lookup():
+    """Look up journaled transactions by tx_id or voter"""
+    tx_id = request.args.get("tx_id")
+    voter = request.args.get("voter")
+    if not tx_id and not voter:
+        return jsonify({"error": "❌ Provide tx_id or voter"}), 400
+
+    journal = get_journal()
+    if tx_id:
+        record = journal.get(tx_id)
+        if not record:
+            return jsonify({"error": "❌ Transaction not found"}), 404
+        return jsonify(record)
+
+    limit = max(1, min(request.args.get("limit", 100, type=int), 1000))
+    return jsonify({"voter": voter, "transactions": journal.by_voter(voter, limit)})
+
 # --------------------------
 # Admin Routes
 # --------------------------
@@ -205,7 +280,8 @@ def add_candidate():
     try:
         receipt = execute_contract_function(
             "addCandidate",
-            ContractFunctionParameters().addString(data["name"]))
+            ContractFunctionParameters().addString(data["name"]),
+            journal_params=[data["name"]])
         
         return jsonify({
             "status": "✅ Candidate added",
@@ -217,6 +293,19 @@ def add_candidate():
         logger.error(f"❌ Add candidate failed: {str(e)}")
         return jsonify({"error": f"❌ {str(e)}"}), 500
 
+@app.route("/election/admin/operators")
+@handle_hedera_errors
+def operator_stats():
+    """Admin: in-flight, balance and failure counts per operator"""
+    return jsonify(operator_pool.stats())
+
+@app.route("/election/admin/gas_report")
+@handle_hedera_errors
+def gas_report():
+    """Admin: gas percentiles and estimated savings per 1000 calls"""
+    gas_price = request.args.get("gas_price", type=float)
+    return jsonify(gas_profiler.report(gas_price=gas_price))
+
 # --------------------------
 # Main Execution
 # --------------------------
@@ -0,0 +1,155 @@
+import os
+import math
+import random
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# --------------------------
+# Configuration
+# --------------------------
+
+GAS_WINDOW = int(os.getenv("GAS_PROFILE_WINDOW", "1000"))        # receipts kept per function
+GAS_MIN_SAMPLES = int(os.getenv("GAS_MIN_SAMPLES", "20"))        # below this, use the static limit
+GAS_SAFETY_MARGIN = float(os.getenv("GAS_SAFETY_MARGIN", "0.2"))  # limit = p99 * (1 + margin)
+GAS_SAMPLE_RATE = float(os.getenv("GAS_SAMPLE_RATE", "0.1"))     # share of Hedera txs whose record we fetch
+GAS_FLOOR = 21000
+GAS_CEILING = 15000000  # Hedera per-transaction gas limit
+
+# Hedera charges at least 80% of the gas limit, whatever was actually used (HIP-185)
+HEDERA_MIN_CHARGE = 0.8
+
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+# --------------------------
+# Gas Profiler
+# --------------------------
+
+class GasProfiler:
+    """Rolling gas-used percentiles per contract function.
+
+    `gas_limit()` hands out p99 plus a safety margin once enough receipts
+    have been seen, and the static limit before that.
+    """
+
+    def __init__(self, window=GAS_WINDOW, min_samples=GAS_MIN_SAMPLES, margin=GAS_SAFETY_MARGIN):
+        self.window = window
+        self.min_samples = min_samples
+        self.margin = margin
+        self._samples = {}
+        self._static_limits = {}
+        self._lock = threading.Lock()
+
+    def record(self, function_name, gas_used):
+        with self._lock:
+            self._samples.setdefault(function_name, deque(maxlen=self.window)).append(int(gas_used))
+
+    def _sorted(self, function_name):
+        with self._lock:
+            return sorted(self._samples.get(function_name, ()))
+
+    def percentile(self, function_name, q):
+        samples = self._sorted(function_name)
+        return _percentile(samples, q) if samples else None
+
+    def _adaptive_limit(self, samples):
+        limit = math.ceil(_percentile(samples, 99) * (1 + self.margin))
+        return min(max(limit, GAS_FLOOR), GAS_CEILING)
+
+    def gas_limit(self, function_name, default):
+        """Gas limit for the next call of `function_name`"""
+        self._static_limits[function_name] = default
+        samples = self._sorted(function_name)
+        if len(samples) < self.min_samples:
+            return default
+        return self._adaptive_limit(samples)
+
+    def report(self, gas_price=None, min_charge=HEDERA_MIN_CHARGE):
+        """Per-function percentiles and estimated gas charged per 1000 calls.
+
+        Charged gas per call is max(used, min_charge * limit). `gas_price`
+        (fee units per gas, e.g. tinybars) adds fee figures when given.
+        """
+        report = {}
+        for function_name in list(self._samples):
+            samples = self._sorted(function_name)
+            if not samples:
+                continue
+            static = self._static_limits.get(function_name)
+            adaptive = self._adaptive_limit(samples)
+
+            def charged_per_thousand(limit):
+                return round(sum(max(used, min_charge * limit) for used in samples) / len(samples) * 1000)
+
+            entry = {
+                "samples": len(samples),
+                "p50": _percentile(samples, 50),
+                "p95": _percentile(samples, 95),
+                "p99": _percentile(samples, 99),
+                "max": samples[-1],
+                "static_limit": static,
+                "adaptive_limit": adaptive,
+                "active": len(samples) >= self.min_samples,
+            }
+            if static:
+                static_gas = charged_per_thousand(static)
+                adaptive_gas = charged_per_thousand(adaptive)
+                entry["gas_per_1000_static"] = static_gas
+                entry["gas_per_1000_adaptive"] = adaptive_gas
+                entry["gas_saved_per_1000"] = static_gas - adaptive_gas
+                if gas_price:
+                    entry["fee_saved_per_1000"] = (static_gas - adaptive_gas) * gas_price
+            report[function_name] = entry
+        return report
+
+
+profiler = GasProfiler()
+
+
+def is_out_of_gas(error):
+    return "INSUFFICIENT_GAS" in str(error)
+
+
+def observe_hedera(function_name, tx, client, always=False):
+    """Record gas used by a Hedera ContractExecuteTransaction response.
+
+    Fetching the record is a paid query, so only GAS_SAMPLE_RATE of the
+    transactions are looked at unless `always`. Failures never reach the
+    caller.
+    """
+    if not always and random.random() >= GAS_SAMPLE_RATE:
+        return
+    try:
+        record = tx.getRecord(client)
+        profiler.record(function_name, record.contractFunctionResult.gasUsed)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read gas used for {function_name}: {str(e)}")
+
+
+def execute_with_gas_retry(function_name, default, submit, client):
+    """Run `submit(gas) -> (tx, receipt)` under the adaptive limit.
+
+    A call that runs out of gas under the adaptive limit (say, an
+    addCandidate with a longer name than any in the window) is retried
+    once with the static `default`, and the retry's gas is always
+    recorded so the window sees the larger cost and the limit goes up.
+    """
+    limit = profiler.gas_limit(function_name, default)
+    try:
+        tx, receipt = submit(limit)
+    except Exception as e:
+        if limit >= default or not is_out_of_gas(e):
+            raise
+        logger.warning(f"⛽ {function_name} ran out of gas at {limit}, retrying with {default}")
+        tx, receipt = submit(default)
+        observe_hedera(function_name, tx, client, always=True)
+        return receipt
+    observe_hedera(function_name, tx, client)
+    return receipt
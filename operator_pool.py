@@ -0,0 +1,201 @@
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# --------------------------
+# Configuration
+# --------------------------
+
+# "0.0.1001:302e...,0.0.1002:302e..."; falls back to HEDERA_ACCOUNT_ID/HEDERA_PRIVATE_KEY
+OPERATORS = os.getenv("HEDERA_OPERATORS", "")
+OPERATOR_MAX_IN_FLIGHT = int(os.getenv("OPERATOR_MAX_IN_FLIGHT", "8"))
+OPERATOR_MIN_BALANCE = int(float(os.getenv("OPERATOR_MIN_BALANCE_HBAR", "5")) * 100_000_000)  # tinybars
+OPERATOR_BALANCE_TTL = float(os.getenv("OPERATOR_BALANCE_TTL", "60"))
+OPERATOR_COOLDOWN = float(os.getenv("OPERATOR_COOLDOWN", "30"))
+OPERATOR_WAIT_TIMEOUT = float(os.getenv("OPERATOR_WAIT_TIMEOUT", "30"))
+
+# Precheck failures are rejected by the node before consensus, so the
+# transaction can safely be resubmitted under another payer. Anything
+# else (timeouts, receipt failures) may already have executed.
+RETRYABLE_STATUSES = (
+    "INSUFFICIENT_PAYER_BALANCE", "INSUFFICIENT_TX_FEE", "PAYER_ACCOUNT_NOT_FOUND",
+    "INVALID_SIGNATURE", "BUSY", "PLATFORM_NOT_ACTIVE", "PLATFORM_TRANSACTION_NOT_CREATED",
+    "TRANSACTION_EXPIRED",
+)
+LOW_BALANCE_STATUSES = ("INSUFFICIENT_PAYER_BALANCE", "INSUFFICIENT_TX_FEE")
+
+
+class NoOperatorAvailable(Exception):
+    """Every operator is busy, cooling down or low on balance"""
+
+
+def is_retryable(error):
+    message = str(error)
+    return any(status in message for status in RETRYABLE_STATUSES)
+
+
+def _hedera_client(account_id, private_key):
+    from hedera import Client, AccountId, PrivateKey
+    client = Client.forTestnet()
+    client.setOperator(AccountId.fromString(account_id), PrivateKey.fromString(private_key))
+    return client
+
+
+def _hedera_balance(client, account_id):
+    from hedera import AccountBalanceQuery, AccountId
+    balance = AccountBalanceQuery().setAccountId(AccountId.fromString(account_id)).execute(client)
+    return int(balance.hbars.toTinybars())
+
+
+# --------------------------
+# Operator
+# --------------------------
+
+class Operator:
+    """One payer account with its own long-lived client"""
+
+    def __init__(self, account_id, client, max_in_flight=OPERATOR_MAX_IN_FLIGHT):
+        self.account_id = account_id
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.balance = None  # tinybars, None until first checked
+        self.cooldown_until = 0.0
+        self.submitted = 0
+        self.failed = 0
+
+    def available(self, now, min_balance):
+        if now < self.cooldown_until or self.in_flight >= self.max_in_flight:
+            return False
+        return self.balance is None or self.balance >= min_balance
+
+    def stats(self):
+        return {
+            "account_id": self.account_id,
+            "in_flight": self.in_flight,
+            "balance_tinybars": self.balance,
+            "cooling_down": time.monotonic() < self.cooldown_until,
+            "submitted": self.submitted,
+            "failed": self.failed,
+        }
+
+
+# --------------------------
+# Operator Pool
+# --------------------------
+
+class OperatorPool:
+    """Shard contract executions across several payer accounts.
+
+    `submit(fn)` runs `fn(client, operator)` on the least loaded operator,
+    preferring larger balances on ties. Operators over their in-flight
+    limit, below the minimum balance or cooling down after a precheck
+    failure are skipped, and the failed submission moves to the next one.
+    Balances are refreshed every `balance_ttl` seconds by a background
+    thread, never on the request path.
+    """
+
+    def __init__(self, operators, balance_fn=_hedera_balance, min_balance=OPERATOR_MIN_BALANCE,
+                 balance_ttl=OPERATOR_BALANCE_TTL, cooldown=OPERATOR_COOLDOWN, wait_timeout=OPERATOR_WAIT_TIMEOUT):
+        self.operators = operators
+        self.balance_fn = balance_fn
+        self.min_balance = min_balance
+        self.balance_ttl = balance_ttl
+        self.cooldown = cooldown
+        self.wait_timeout = wait_timeout
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="operator-balances", daemon=True)
+        self._refresher.start()
+
+    @classmethod
+    def from_env(cls, client_factory=_hedera_client, **kwargs):
+        pairs = [p.strip().split(":", 1) for p in OPERATORS.split(",") if p.strip()]
+        if not pairs:
+            pairs = [(os.getenv("HEDERA_ACCOUNT_ID"), os.getenv("HEDERA_PRIVATE_KEY"))]
+        operators = []
+        for account_id, key in pairs:
+            try:
+                operators.append(Operator(account_id, client_factory(account_id, key)))
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize operator {account_id}: {str(e)}")
+        if operators:
+            logger.info(f"✅ Operator pool: {', '.join(op.account_id for op in operators)}")
+        else:
+            logger.error("❌ No usable Hedera operator, contract executions will fail")
+        return cls(operators, **kwargs)
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            self._refresh_balances()
+            self._stop.wait(self.balance_ttl)
+
+    def _refresh_balances(self):
+        for op in self.operators:
+            try:
+                balance = self.balance_fn(op.client, op.account_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Balance check failed for {op.account_id}: {str(e)}")
+                continue
+            with self._cond:
+                op.balance = balance
+                self._cond.notify_all()  # a topped-up operator may be usable again
+            if balance < self.min_balance:
+                logger.warning(f"⚠️ Operator {op.account_id} is low on balance ({balance} tinybars)")
+
+    def _acquire(self, exclude):
+        """Reserve a slot on the best operator, waiting for one to free up"""
+        deadline = time.monotonic() + self.wait_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                candidates = [op for op in self.operators
+                              if op not in exclude and op.available(now, self.min_balance)]
+                if candidates:
+                    op = min(candidates, key=lambda o: (o.in_flight / o.max_in_flight, -(o.balance or 0)))
+                    op.in_flight += 1
+                    return op
+                if len(exclude) >= len(self.operators) or now >= deadline:
+                    raise NoOperatorAvailable("No Hedera operator available")
+                # Wake up on a released slot, or in time for a cooldown to end
+                self._cond.wait(timeout=min(1.0, deadline - now))
+
+    def _release(self, op, error=None):
+        with self._cond:
+            op.in_flight -= 1
+            op.submitted += 1
+            if error is not None:
+                op.failed += 1
+            # Contract reverts are not the operator's fault; precheck failures are
+            if error is not None and is_retryable(error):
+                op.cooldown_until = time.monotonic() + self.cooldown
+                if any(status in str(error) for status in LOW_BALANCE_STATUSES):
+                    op.balance = 0
+            self._cond.notify_all()
+
+    def submit(self, fn):
+        """Run `fn(client, operator)` with failover; returns its result"""
+        tried = []
+        while True:
+            op = self._acquire(tried)
+            try:
+                result = fn(op.client, op)
+            except Exception as e:
+                self._release(op, e)
+                tried.append(op)
+                if not is_retryable(e) or len(tried) >= len(self.operators):
+                    raise
+                logger.warning(f"⚠️ Operator {op.account_id} failed ({str(e)}), failing over")
+                continue
+            self._release(op)
+            return result
+
+    def stats(self):
+        return [op.stats() for op in self.operators]
+
+    def close(self):
+        """Stop the balance refresher"""
+        self._stop.set()
@@ -0,0 +1,100 @@
+import os
+import math
+import time
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+# --------------------------
+# Configuration
+# --------------------------
+
+# Comma separated node account ids, e.g. "0.0.3,0.0.4,0.0.5".
+# Empty means "let the SDK pick a node" for every query.
+QUERY_NODES = [n.strip() for n in os.getenv("HEDERA_QUERY_NODES", "").split(",") if n.strip()]
+QUERY_WORKERS = int(os.getenv("HEDERA_QUERY_WORKERS", "8"))
+QUERY_TIMEOUT = float(os.getenv("HEDERA_QUERY_TIMEOUT", "10"))
+
+
+class QueryTimeoutError(Exception):
+    """Raised when a query does not answer within the per-query timeout"""
+
+
+# --------------------------
+# Parallel Query Executor
+# --------------------------
+
+class ParallelQueryExecutor:
+    """Fan contract queries out over a thread pool and a set of nodes.
+
+    `query_fn(function_name, params, node, **kwargs)` does the actual round
+    trip; `node` is one of `nodes` (round robin) or None when no nodes are
+    set. Results come back in the same order as the submitted queries.
+    """
+
+    def __init__(self, query_fn, nodes=None, max_workers=QUERY_WORKERS, timeout=QUERY_TIMEOUT):
+        self.query_fn = query_fn
+        self.nodes = list(nodes if nodes is not None else QUERY_NODES)
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedera-query")
+        self._node_cycle = itertools.cycle(self.nodes or [None])
+        self._lock = threading.Lock()
+
+    def _next_node(self):
+        with self._lock:
+            return next(self._node_cycle)
+
+    def _timed(self, started, index, function_name, params, node, **kwargs):
+        started[index] = time.monotonic()
+        return self.query_fn(function_name, params, node, **kwargs)
+
+    def run(self, queries, **kwargs):
+        """Run `[(function_name, params), ...]` concurrently, return results in order.
+
+        Each query's timeout starts when a worker picks it up, so a batch
+        larger than the pool is not failed for time spent in the queue. The
+        batch as a whole gets `timeout * ceil(len(queries) / max_workers)`
+        from submission, so it cannot queue forever behind hung queries
+        that still hold workers.
+        """
+        started = {}
+        deadline = time.monotonic() + self.timeout * math.ceil(len(queries) / self.max_workers)
+        futures = [
+            self._pool.submit(self._timed, started, i, name, params, self._next_node(), **kwargs)
+            for i, (name, params) in enumerate(queries)
+        ]
+        pending = set(futures)
+
+        while pending:
+            now = time.monotonic()
+            running = [i for i, f in enumerate(futures) if f in pending and i in started]
+            expired = [i for i in running if now - started[i] >= self.timeout]
+            if now >= deadline:
+                expired = [i for i, f in enumerate(futures) if f in pending]
+            if expired:
+                for future in pending:
+                    future.cancel()
+                failed = [queries[i][0] for i in expired]
+                logger.error(f"⏱️ {len(failed)} queries timed out after {self.timeout}s: {failed}")
+                raise QueryTimeoutError(f"Queries timed out: {', '.join(failed)}")
+
+            # Sleep until the next running query is due, re-checking often
+            # enough to notice queued ones starting
+            next_due = min((started[i] + self.timeout - now for i in running), default=deadline - now)
+            next_due = min(next_due, deadline - now)
+            if len(running) < len(pending):
+                next_due = min(next_due, self.timeout / 10)
+            _, pending = wait(pending, timeout=max(next_due, 0), return_when=FIRST_COMPLETED)
+
+        return [f.result() for f in futures]
+
+    def run_one(self, function_name, params=None, **kwargs):
+        """Run a single query on the next node, with the same timeout"""
+        return self.run([(function_name, params)], **kwargs)[0]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
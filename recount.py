@@ -0,0 +1,212 @@
+"""Independent recount of the election from its Voted event history.
+
+Streams Voted logs in bounded block ranges, decodes them in bulk with
+NumPy, tallies with bincount and diffs the result against the contract's
+own getCandidate/getWinner totals.
+
+    python recount.py --from-block 0 --chunk-size 5000
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import numpy as np
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+VOTED_SIGNATURE = "Voted(address,uint256)"
+RECOUNT_CHUNK_BLOCKS = int(os.getenv("RECOUNT_CHUNK_BLOCKS", "5000"))
+VOTER_KEY = np.dtype("V20")  # raw voter address bytes
+
+
+def event_topic(signature):
+    return Web3.keccak(text=signature)
+
+
+# --------------------------
+# Log streaming
+# --------------------------
+
+def iter_log_chunks(web3, address, topic, from_block, to_block, chunk_size=RECOUNT_CHUNK_BLOCKS):
+    """Yield `(start, end, logs)` per block range, oldest first.
+
+    The range is halved whenever the provider rejects it (most cap the
+    number of results per eth_getLogs call), so memory stays bounded.
+    """
+    start = from_block
+    size = chunk_size
+    while start <= to_block:
+        end = min(start + size - 1, to_block)
+        try:
+            logs = web3.eth.get_logs({
+                "address": address,
+                "topics": [topic],
+                "fromBlock": start,
+                "toBlock": end,
+            })
+        except Exception as e:
+            if size == 1:
+                raise
+            size = max(1, size // 2)
+            logger.warning(f"get_logs {start}-{end} failed ({str(e)}), retrying with {size} blocks")
+            continue
+        yield start, end, logs
+        start = end + 1
+
+
+# --------------------------
+# Bulk decoding
+# --------------------------
+
+def voted_words(logs):
+    """Raw Voted data as an `(n, 64)` uint8 array, one row per log"""
+    raw = np.frombuffer(b"".join(bytes(log["data"]) for log in logs), dtype=np.uint8)
+    return raw.reshape(-1, 64)
+
+
+def decode_voted(logs):
+    """Decode Voted logs into `(voter_keys, candidate_ids, valid)` arrays.
+
+    Both event fields are non-indexed, so every log carries exactly 64
+    bytes of data: the left-padded voter address and the candidate id.
+    `voter_keys` are the full 20-byte addresses as a `V20` array, which
+    sorts and compares bytewise. `valid` is False for ids that do not fit
+    in 63 bits.
+    """
+    if not logs:
+        empty = np.empty(0, dtype=np.int64)
+        return np.empty(0, dtype=VOTER_KEY), empty, np.empty(0, dtype=bool)
+    return decode_voted_words(voted_words(logs))
+
+
+def decode_voted_words(words):
+    """`decode_voted` for rows already gathered by `voted_words`"""
+    voter_keys = np.ascontiguousarray(words[:, 12:32]).view(VOTER_KEY).ravel()
+    ids = np.ascontiguousarray(words[:, 56:64]).view(">u8").ravel()
+    valid = ~words[:, 32:56].any(axis=1) & (ids < 2 ** 63)
+    candidate_ids = np.where(valid, ids, 0).astype(np.int64)
+    return voter_keys, candidate_ids, valid
+
+
+def find_duplicates(voter_keys):
+    """Return `(duplicate_voter_keys, extra_votes)` for a `V20` key array"""
+    if voter_keys.size == 0:
+        return voter_keys, 0
+    keys = np.sort(voter_keys)
+    repeated = keys[1:] == keys[:-1]
+    return np.unique(keys[1:][repeated]), int(repeated.sum())
+
+
+# --------------------------
+# Recount
+# --------------------------
+
+def tally_events(web3, address, from_block, to_block, candidates_count, chunk_size=RECOUNT_CHUNK_BLOCKS):
+    """Tally all Voted events in the block range.
+
+    Ids outside 1..candidates_count are counted as unknown rather than
+    binned, so a bogus id cannot size the tally array.
+    """
+    counts = np.zeros(candidates_count + 1, dtype=np.int64)
+    key_chunks = []
+    invalid = 0
+    unknown = 0
+    events = 0
+
+    for start, end, logs in iter_log_chunks(web3, address, event_topic(VOTED_SIGNATURE),
+                                           from_block, to_block, chunk_size):
+        voter_keys, candidate_ids, valid = decode_voted(logs)
+        events += len(logs)
+        invalid += int((~valid).sum())
+        known = valid & (candidate_ids >= 1) & (candidate_ids <= candidates_count)
+        unknown += int((valid & ~known).sum())
+        counts += np.bincount(candidate_ids[known], minlength=counts.size)
+        key_chunks.append(voter_keys)
+
+    duplicate_keys, duplicate_votes = find_duplicates(
+        np.concatenate(key_chunks) if key_chunks else np.empty(0, dtype=VOTER_KEY))
+    return {
+        "events": events,
+        "counts": counts,
+        "invalid_events": invalid,
+        "unknown_candidate_votes": unknown,
+        "duplicate_voters": [Web3.to_checksum_address(k.tobytes()) for k in duplicate_keys[:100]],
+        "duplicate_voter_count": int(duplicate_keys.size),
+        "duplicate_votes": duplicate_votes,
+    }
+
+
+def recount(web3, contract, from_block=0, to_block="latest", chunk_size=RECOUNT_CHUNK_BLOCKS):
+    """Recount from events and diff against getCandidate/getWinner"""
+    if to_block == "latest":
+        to_block = web3.eth.block_number
+
+    # Read the contract at the same block the events are tallied up to
+    candidates_count = contract.functions.candidatesCount().call(block_identifier=to_block)
+    tally = tally_events(web3, contract.address, from_block, to_block, candidates_count, chunk_size)
+    counts = tally["counts"]
+
+    candidates = []
+    mismatches = []
+    for candidate_id in range(1, candidates_count + 1):
+        name, on_chain = contract.functions.getCandidate(candidate_id).call(block_identifier=to_block)
+        recounted = int(counts[candidate_id])
+        candidates.append({
+            "id": candidate_id,
+            "name": name,
+            "on_chain_votes": on_chain,
+            "recounted_votes": recounted,
+        })
+        if recounted != on_chain:
+            mismatches.append({"id": candidate_id, "name": name, "difference": recounted - on_chain})
+
+    # Votes for ids the contract never registered
+    unknown_ids = tally["unknown_candidate_votes"]
+
+    winner_name, winner_votes = contract.functions.getWinner().call(block_identifier=to_block)
+    top = max((c["recounted_votes"] for c in candidates), default=0)
+    leaders = [c["name"] for c in candidates if c["recounted_votes"] == top]
+    winner_ok = winner_votes == top and winner_name in leaders
+
+    return {
+        "from_block": from_block,
+        "to_block": to_block,
+        "events": tally["events"],
+        "total_recounted": int(counts.sum()) + unknown_ids,
+        "total_on_chain": sum(c["on_chain_votes"] for c in candidates),
+        "candidates": candidates,
+        "mismatches": mismatches,
+        "unknown_candidate_votes": unknown_ids,
+        "invalid_events": tally["invalid_events"],
+        "duplicate_voter_count": tally["duplicate_voter_count"],
+        "duplicate_votes": tally["duplicate_votes"],
+        "duplicate_voters": tally["duplicate_voters"],
+        "winner": {
+            "on_chain": {"name": winner_name, "votes": winner_votes},
+            "recounted_leaders": leaders,
+            "recounted_votes": top,
+            "match": winner_ok,
+        },
+        "match": not mismatches and not unknown_ids and not tally["duplicate_votes"] and winner_ok,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recount the election from Voted events")
+    parser.add_argument("--from-block", type=int, default=int(os.getenv("ELECTION_START_BLOCK", "0")))
+    parser.add_argument("--to-block", default="latest")
+    parser.add_argument("--chunk-size", type=int, default=RECOUNT_CHUNK_BLOCKS)
+    args = parser.parse_args()
+
+    from app import web3, contract
+
+    to_block = args.to_block if args.to_block == "latest" else int(args.to_block)
+    report = recount(web3, contract, args.from_block, to_block, args.chunk_size)
+    print(json.dumps(report, indent=2))
+    return 0 if report["match"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import os
+import time
+import logging
+import threading
+from collections import deque, Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+# --------------------------
+# Configuration
+# --------------------------
+
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "10"))
+HEDGE_QUANTILE = float(os.getenv("RPC_HEDGE_QUANTILE", "95"))
+MIN_HEDGE_DELAY = float(os.getenv("RPC_MIN_HEDGE_DELAY", "0.05"))
+COOLDOWN_SECONDS = float(os.getenv("RPC_COOLDOWN_SECONDS", "30"))
+# Expected chain id; when unset, the pinned node's (or the backups' majority) is used
+RPC_CHAIN_ID = int(os.getenv("RPC_CHAIN_ID")) if os.getenv("RPC_CHAIN_ID") else None
+MAX_CONSECUTIVE_ERRORS = 3
+STATS_WINDOW = 200
+
+
+# --------------------------
+# Endpoint health
+# --------------------------
+
+class Endpoint:
+    """One RPC node with its own Web3 instance and rolling stats"""
+
+    def __init__(self, url, timeout=RPC_TIMEOUT):
+        self.url = url
+        self.web3 = Web3(Web3.HTTPProvider(url, request_kwargs={"timeout": timeout}))
+        self.contract = None
+        self.chain_ok = None  # None until the chain id has been checked
+        self.latencies = deque(maxlen=STATS_WINDOW)
+        self.outcomes = deque(maxlen=STATS_WINDOW)  # True = success
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies.append(latency)
+                self.consecutive_errors = 0
+            else:
+                self.consecutive_errors += 1
+                if self.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                    self.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+                    logger.warning(f"⚠️ RPC {self.url} failing, cooling down for {COOLDOWN_SECONDS}s")
+
+    @property
+    def healthy(self):
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def error_rate(self):
+        with self._lock:
+            return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def latency_quantile(self, q):
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    def score(self, default_latency):
+        """Lower is better: median latency inflated by the error rate.
+
+        Nodes without successful samples are assumed to be as fast as a
+        typical node, so they are neither preferred nor starved, and their
+        errors still count against them.
+        """
+        median = self.latency_quantile(50)
+        return (median if median is not None else default_latency) * (1 + 4 * self.error_rate)
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": round((self.latency_quantile(50) or 0) * 1000, 1),
+            "p95_ms": round((self.latency_quantile(95) or 0) * 1000, 1),
+        }
+
+
+# --------------------------
+# Provider Router
+# --------------------------
+
+class ProviderRouter:
+    """Route reads to the fastest healthy RPC node, with hedging.
+
+    A read goes to the best-ranked node; if it has not answered after that
+    node's p95 latency, a duplicate goes to the runner-up and whichever
+    succeeds first wins. Writes always use the first (pinned) node so nonces
+    and pending transactions stay consistent.
+
+    Reads only go to nodes confirmed to be on the expected chain. Chain ids
+    are checked once in `bind_contract`, and nodes that did not answer are
+    re-checked in the background every COOLDOWN_SECONDS, never on a read.
+    """
+
+    def __init__(self, urls, timeout=RPC_TIMEOUT, hedge_quantile=HEDGE_QUANTILE, min_hedge_delay=MIN_HEDGE_DELAY,
+                 chain_id=RPC_CHAIN_ID):
+        if not urls:
+            raise ValueError("At least one RPC URL is required")
+        self.endpoints = [Endpoint(url, timeout) for url in urls]
+        self.hedge_quantile = hedge_quantile
+        self.min_hedge_delay = min_hedge_delay
+        self.chain_id = chain_id
+        self._pool = ThreadPoolExecutor(max_workers=4 * len(urls) + 4, thread_name_prefix="rpc")
+        self._checker = None
+
+    @property
+    def pinned(self):
+        return self.endpoints[0]
+
+    @property
+    def web3(self):
+        """Web3 bound to the pinned node, for writes and nonce lookups"""
+        return self.pinned.web3
+
+    @property
+    def contract(self):
+        return self.pinned.contract
+
+    def bind_contract(self, address, abi):
+        for endpoint in self.endpoints:
+            endpoint.contract = endpoint.web3.eth.contract(address=address, abi=abi)
+        if not self.check_chains() and self._checker is None:
+            self._checker = threading.Thread(target=self._recheck_loop, name="rpc-chain-check", daemon=True)
+            self._checker.start()
+        return self.contract
+
+    def check_chains(self):
+        """Classify every unchecked node by its chain id; True once all are known"""
+        unchecked = [e for e in self.endpoints if e.chain_ok is None]
+        futures = {e: self._pool.submit(lambda e=e: e.web3.eth.chain_id) for e in unchecked}
+        answers = {}
+        for endpoint, future in futures.items():
+            try:
+                answers[endpoint] = future.result()
+            except Exception as e:
+                endpoint.record(0.0, False)
+                logger.warning(f"⚠️ Chain id check failed on {endpoint.url}: {str(e)}")
+
+        if self.chain_id is None and answers:
+            if self.pinned in answers:
+                self.chain_id = answers[self.pinned]
+            else:
+                # Pinned node unreachable: go with what most backups agree on
+                self.chain_id = Counter(answers.values()).most_common(1)[0][0]
+                logger.warning(f"⚠️ Pinned RPC {self.pinned.url} unreachable, using chain {self.chain_id} from backups")
+
+        if self.chain_id is not None:
+            for endpoint, chain_id in answers.items():
+                endpoint.chain_ok = chain_id == self.chain_id
+                if not endpoint.chain_ok:
+                    logger.error(f"❌ RPC {endpoint.url} is on chain {chain_id}, not {self.chain_id}; ignoring it")
+        return all(e.chain_ok is not None for e in self.endpoints)
+
+    def _recheck_loop(self):
+        while True:
+            time.sleep(COOLDOWN_SECONDS)
+            if self.check_chains():
+                return
+
+    def ranked(self):
+        usable = [e for e in self.endpoints if e.chain_ok]
+        if not usable:
+            # Nothing confirmed yet: anything not known to be on another chain
+            usable = [e for e in self.endpoints if e.chain_ok is not False] or [self.pinned]
+        healthy = [e for e in usable if e.healthy]
+        if not healthy:
+            # Everyone is cooling down: try the least bad ones anyway
+            return sorted(usable, key=lambda e: e.error_rate)
+        measured = sorted(m for m in (e.latency_quantile(50) for e in usable) if m is not None)
+        typical = measured[len(measured) // 2] if measured else 0.0
+        return sorted(healthy, key=lambda e: e.score(typical))
+
+    def _timed(self, endpoint, fn):
+        start = time.perf_counter()
+        try:
+            result = fn(endpoint.web3, endpoint.contract)
+        except Exception:
+            endpoint.record(time.perf_counter() - start, False)
+            raise
+        endpoint.record(time.perf_counter() - start, True)
+        return result
+
+    def read(self, fn):
+        """Run `fn(web3, contract)` on the best node, hedging to the next one"""
+        candidates = self.ranked()
+        primary = candidates[0]
+        backups = candidates[1:]
+
+        futures = {self._pool.submit(self._timed, primary, fn): primary}
+        hedge_delay = max(primary.latency_quantile(self.hedge_quantile) or self.min_hedge_delay,
+                          self.min_hedge_delay)
+        done, _ = wait(futures, timeout=hedge_delay)
+
+        last_error = None
+        while True:
+            for future in done:
+                endpoint = futures.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"⚠️ RPC read failed on {endpoint.url}: {str(e)}")
+
+            # Primary is slow or failed: bring in the next node
+            if backups and (last_error is not None or len(futures) < 2):
+                backup = backups.pop(0)
+                futures[self._pool.submit(self._timed, backup, fn)] = backup
+
+            if not futures:
+                raise last_error
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+    def stats(self):
+        return [e.stats() for e in self.endpoints]
@@ -0,0 +1,152 @@
+import os
+import sys
+import hmac
+import time
+import threading
+from collections import Counter
+from flask import request, jsonify, Response
+
+# --------------------------
+# Configuration
+# --------------------------
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # profiling is disabled when unset
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_DEFAULT_INTERVAL_MS = 5
+
+
+def _frame_label(code):
+    """`package/module.py:function`, trimmed to something readable"""
+    path = code.co_filename
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        if marker in path:
+            path = path.split(marker, 1)[1]
+            break
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{code.co_name}"
+
+
+# --------------------------
+# Sampling Profiler
+# --------------------------
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for all threads of this worker.
+
+    Request threads are always tagged with their Flask endpoint (one dict
+    write and one pop per request), so requests already running when a
+    session starts are still attributed to their route. The tags are only
+    read while sampling.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.route_tags = {}
+        self._session_lock = threading.Lock()
+
+    def tag(self, endpoint):
+        self.route_tags[threading.get_ident()] = endpoint or "unknown"
+
+    def untag(self):
+        self.route_tags.pop(threading.get_ident(), None)
+
+    def profile(self, seconds, interval=PROFILE_DEFAULT_INTERVAL_MS / 1000):
+        """Sample for `seconds`; returns a Counter of collapsed stacks"""
+        if not self._session_lock.acquire(blocking=False):
+            raise RuntimeError("A profiling session is already running")
+        stacks = Counter()
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        try:
+            self.active = True
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == me:
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(_frame_label(frame.f_code))
+                        frame = frame.f_back
+                    route = self.route_tags.get(thread_id)
+                    if route is None:
+                        if thread_id not in names:
+                            names = {t.ident: t.name for t in threading.enumerate()}
+                        root = f"thread:{names.get(thread_id, thread_id)}"
+                    else:
+                        root = f"route:{route}"
+                    labels.append(root)
+                    stacks[";".join(reversed(labels))] += 1
+                time.sleep(interval)
+        finally:
+            self.active = False
+            self._session_lock.release()
+        return stacks
+
+
+def collapsed(stacks):
+    """Collapsed-stack text, the input format of flamegraph.pl and speedscope"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def summarize(stacks, top=15):
+    """Samples per route and the hottest leaf frames of each"""
+    routes = {}
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        entry = routes.setdefault(frames[0], {"samples": 0, "leaf_frames": Counter()})
+        entry["samples"] += count
+        entry["leaf_frames"][frames[-1]] += count
+    return {
+        route: {"samples": entry["samples"], "top_frames": entry["leaf_frames"].most_common(top)}
+        for route, entry in sorted(routes.items(), key=lambda item: -item[1]["samples"])
+    }
+
+
+profiler = SamplingProfiler()
+
+
+def register_profiler(app):
+    """Add request tagging hooks and the admin-only /admin/profile endpoint.
+
+    The endpoint blocks for the sampling window, so it needs a threaded
+    server (Flask's dev server, or gunicorn with --threads/gthread).
+    """
+
+    @app.before_request
+    def _tag_route():
+        profiler.tag(request.endpoint)
+
+    @app.teardown_request
+    def _untag_route(exc=None):
+        profiler.untag()
+
+    @app.route("/admin/profile", methods=["POST"])
+    def admin_profile():
+        token = request.headers.get("X-Admin-Token", "")
+        if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+            return jsonify({"error": "Forbidden"}), 403
+
+        seconds = request.args.get("seconds", default=10, type=float)
+        interval_ms = request.args.get("interval_ms", default=PROFILE_DEFAULT_INTERVAL_MS, type=float)
+        if not 0 < seconds <= PROFILE_MAX_SECONDS or not 1 <= interval_ms <= 1000:
+            return jsonify({"error": f"seconds must be in (0, {PROFILE_MAX_SECONDS}], interval_ms in [1, 1000]"}), 400
+
+        try:
+            stacks = profiler.profile(seconds, interval_ms / 1000)
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 409
+
+        if request.args.get("format") == "json":
+            return jsonify({
+                "pid": os.getpid(),
+                "seconds": seconds,
+                "samples": sum(stacks.values()),
+                "routes": summarize(stacks),
+            })
+        return Response(
+            collapsed(stacks),
+            mimetype="text/plain",
+            headers={"Content-Disposition": f"attachment; filename=profile-{os.getpid()}.collapsed"},
+        )
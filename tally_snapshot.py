@@ -0,0 +1,280 @@
+"""Shared-memory tally snapshot, written by one chain reader process.
+
+Run the reader next to the web workers:
+
+    python tally_snapshot.py
+
+It polls the contract and publishes the candidate tally and winner into a
+fixed-layout shared-memory segment guarded by a seqlock. Flask workers
+attach to the segment and read it directly, without any RPC.
+"""
+import os
+import sys
+import time
+import struct
+import logging
+import threading
+from multiprocessing import shared_memory, resource_tracker
+
+logger = logging.getLogger(__name__)
+
+# --------------------------
+# Configuration
+# --------------------------
+
+TALLY_SHM_NAME = os.getenv("TALLY_SHM_NAME", "election_tally")
+TALLY_MAX_CANDIDATES = int(os.getenv("TALLY_MAX_CANDIDATES", "256"))
+TALLY_POLL_SECONDS = float(os.getenv("TALLY_POLL_SECONDS", "2"))
+TALLY_MAX_AGE = float(os.getenv("TALLY_MAX_AGE", "30"))  # older snapshots are ignored
+NAME_BYTES = 64
+
+# seq, version, block_number, updated_at, candidate count, winner id (0 = none), max candidates
+HEADER = struct.Struct("<QQQdIII")
+SEQ = struct.Struct("<Q")
+
+
+def _segment_size(max_candidates):
+    return HEADER.size + max_candidates * (8 + NAME_BYTES)
+
+
+def _encode_name(name):
+    """Fixed-width name slot, or None when the name does not fit"""
+    raw = name.encode("utf-8")
+    if len(raw) > NAME_BYTES:
+        return None
+    return raw.ljust(NAME_BYTES, b"\0")
+
+
+def _segment_inode(name):
+    """Inode behind the segment name, or None where there is no /dev/shm"""
+    try:
+        return os.stat(os.path.join("/dev/shm", name)).st_ino
+    except OSError:
+        return None
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track=, stop the tracker unlinking it on exit
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+# --------------------------
+# Writer (reader process)
+# --------------------------
+
+class TallyPublisher:
+    """Single writer of the snapshot segment"""
+
+    def __init__(self, name=TALLY_SHM_NAME, max_candidates=TALLY_MAX_CANDIDATES):
+        self.max_candidates = max_candidates
+        size = _segment_size(max_candidates)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a previous reader process; reuse if the layout fits
+            self.shm = _attach(name)
+            if self.shm.size < size:
+                self.shm.close()
+                raise ValueError(f"Shared memory {name} is too small, remove /dev/shm/{name}")
+        self.buf = self.shm.buf
+        self.counts = self.buf[HEADER.size:HEADER.size + 8 * max_candidates].cast("Q")
+        self.names_offset = HEADER.size + 8 * max_candidates
+        seq, self.version = HEADER.unpack_from(self.buf, 0)[:2]
+        self.seq = seq + (seq & 1)  # recover from a writer that died mid-publish
+        SEQ.pack_into(self.buf, 0, self.seq)
+        self._last = None
+
+    def publish(self, candidates, winner_id, block_number):
+        """Publish `[{"id", "name", "votes"}, ...]` ordered by id"""
+        if len(candidates) > self.max_candidates:
+            logger.error(f"❌ {len(candidates)} candidates exceed TALLY_MAX_CANDIDATES={self.max_candidates}")
+            return False
+
+        state = ([(c["name"], c["votes"]) for c in candidates], winner_id)
+        if state == self._last:
+            self.heartbeat(block_number)
+            return False
+
+        names = [_encode_name(c["name"]) for c in candidates]
+        if None in names:
+            # A truncated name would differ from getCandidate; send readers to RPC instead
+            logger.error(f"❌ A candidate name is longer than {NAME_BYTES} bytes, snapshot disabled")
+            self._write(lambda: None, block_number, updated_at=0.0)
+            self._last = None
+            return False
+
+        def write_body():
+            for i, c in enumerate(candidates):
+                self.counts[i] = c["votes"]
+                start = self.names_offset + i * NAME_BYTES
+                self.buf[start:start + NAME_BYTES] = names[i]
+
+        self.version += 1
+        self._write(write_body, block_number, len(candidates), winner_id)
+        self._last = state
+        return True
+
+    def heartbeat(self, block_number):
+        """Nothing changed: only refresh the timestamp so readers know we are alive"""
+        self._write(lambda: None, block_number)
+
+    def _write(self, write_body, block_number, count=None, winner_id=None, updated_at=None):
+        """Seqlock-protected update; `updated_at=0.0` marks the snapshot unusable"""
+        _, _, _, _, old_count, old_winner, _ = HEADER.unpack_from(self.buf, 0)
+        count = old_count if count is None else count
+        winner_id = old_winner if winner_id is None else winner_id
+
+        self.seq += 1  # odd: write in progress
+        SEQ.pack_into(self.buf, 0, self.seq)
+        write_body()
+        updated_at = time.time() if updated_at is None else updated_at
+        HEADER.pack_into(self.buf, 0, self.seq, self.version, block_number, updated_at,
+                         count, winner_id, self.max_candidates)
+        self.seq += 1  # even: consistent again
+        SEQ.pack_into(self.buf, 0, self.seq)
+
+    def close(self, unlink=False):
+        self.counts.release()
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# --------------------------
+# Reader (Flask workers)
+# --------------------------
+
+class TallySnapshot:
+    """Read side of the segment; `read()` never blocks the writer"""
+
+    def __init__(self, shm, name=TALLY_SHM_NAME):
+        self.shm = shm
+        self.name = name
+        self.inode = _segment_inode(name)
+        self.buf = shm.buf
+        self._bind(HEADER.unpack_from(self.buf, 0)[6])
+
+    def _bind(self, max_candidates):
+        # The layout is only known once the writer has published a header
+        self.max_candidates = max_candidates
+        self.counts = self.buf[HEADER.size:HEADER.size + 8 * max_candidates].cast("Q")
+        self.names_offset = HEADER.size + 8 * max_candidates
+
+    @classmethod
+    def attach(cls, name=TALLY_SHM_NAME):
+        """Attach to the segment, or None when no reader process runs"""
+        try:
+            return cls(_attach(name), name)
+        except FileNotFoundError:
+            return None
+
+    def replaced(self):
+        """True once the name points at a different segment (reader restarted)"""
+        return self.inode is not None and _segment_inode(self.name) != self.inode
+
+    def close(self):
+        self.counts.release()
+        self.buf = None
+        self.shm.close()
+
+    def read(self, max_age=TALLY_MAX_AGE, retries=100):
+        """Consistent copy of the tally, or None if missing or stale"""
+        for _ in range(retries):
+            seq = SEQ.unpack_from(self.buf, 0)[0]
+            if seq == 0 or seq & 1:
+                continue  # never written, or a write is in progress
+            _, version, block, updated_at, count, winner_id, max_candidates = HEADER.unpack_from(self.buf, 0)
+            if max_candidates != self.max_candidates:
+                self._bind(max_candidates)
+            votes = self.counts[:count].tolist()
+            names = bytes(self.buf[self.names_offset:self.names_offset + count * NAME_BYTES])
+            if SEQ.unpack_from(self.buf, 0)[0] != seq:
+                continue  # torn read, try again
+
+            if not updated_at or (max_age and time.time() - updated_at > max_age):
+                return None  # disabled by the writer, or stale
+            candidates = [
+                {"id": i + 1,
+                 "name": names[i * NAME_BYTES:(i + 1) * NAME_BYTES].rstrip(b"\0").decode("utf-8"),
+                 "votes": votes[i]}
+                for i in range(count)
+            ]
+            winner = candidates[winner_id - 1] if 0 < winner_id <= count else None
+            return {
+                "version": version,
+                "block": block,
+                "updated_at": updated_at,
+                "candidates": candidates,
+                "winner": winner,
+            }
+        return None
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def read_snapshot():
+    """Current snapshot for this worker, attaching lazily; None means use RPC.
+
+    A restarted reader process unlinks the old segment and creates a new
+    one, so a missing, stale or replaced segment is dropped and attached
+    again on the next call. The lock keeps one request thread from
+    closing the mapping while another is reading it; a read is a copy of
+    a few KB, so holding it is cheap.
+    """
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is not None and _snapshot.replaced():
+            _snapshot.close()
+            _snapshot = None
+        if _snapshot is None:
+            _snapshot = TallySnapshot.attach()
+            if _snapshot is None:
+                return None
+        snapshot = _snapshot.read()
+        if snapshot is None:
+            _snapshot.close()
+            _snapshot = None
+        return snapshot
+
+
+# --------------------------
+# Chain reader process
+# --------------------------
+
+def run_reader(poll_seconds=TALLY_POLL_SECONDS):
+    from app import router, fetch_candidates
+
+    publisher = TallyPublisher()
+    logger.info(f"✅ Publishing tally to shared memory '{TALLY_SHM_NAME}' every {poll_seconds}s")
+    last_block = None
+    try:
+        while True:
+            try:
+                block = router.read(lambda w3, c: w3.eth.block_number)
+                if block != last_block:
+                    candidates = router.read(lambda w3, c: fetch_candidates(c))
+                    winner_name, winner_votes = router.read(lambda w3, c: c.functions.getWinner().call())
+                    winner_id = next((c["id"] for c in candidates
+                                      if c["name"] == winner_name and c["votes"] == winner_votes), 0)
+                    if publisher.publish(candidates, winner_id, block):
+                        logger.info(f"📊 Tally v{publisher.version} at block {block}")
+                    last_block = block
+                else:
+                    publisher.heartbeat(block)
+            except Exception as e:
+                logger.error(f"❌ Tally refresh failed: {str(e)}")
+            time.sleep(poll_seconds)
+    finally:
+        publisher.close(unlink=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    sys.exit(run_reader())
@@ -0,0 +1,94 @@
+"""ProviderRouter failover with the pinned node down, against stand-in nodes:
+
+    python -m unittest test_rpc_router
+"""
+import unittest
+from unittest import mock
+
+import rpc_router
+from rpc_router import ProviderRouter
+
+
+class StandInNode:
+    """Just enough of a Web3 instance for the router"""
+
+    def __init__(self, url, chain_id, up=True):
+        self.url = url
+        self.up = up
+        self.chain_id_calls = 0
+        self.reads = 0
+        self._chain_id = chain_id
+        self.eth = self
+
+    @property
+    def chain_id(self):
+        self.chain_id_calls += 1
+        if not self.up:
+            raise ConnectionError(f"{self.url} is down")
+        return self._chain_id
+
+    def contract(self, address, abi):
+        return self
+
+
+class StandInWeb3:
+    nodes = {}
+
+    @staticmethod
+    def HTTPProvider(url, request_kwargs=None):
+        return url
+
+    def __new__(cls, url):
+        return cls.nodes[url]
+
+
+def make_router(nodes, **kwargs):
+    StandInWeb3.nodes = {node.url: node for node in nodes}
+    with mock.patch.object(rpc_router, "Web3", StandInWeb3):
+        router = ProviderRouter(list(StandInWeb3.nodes), **kwargs)
+    router.bind_contract("0xElection", [])
+    return router
+
+
+def read_url(router):
+    def fn(w3, contract):
+        if not w3.up:
+            raise ConnectionError(f"{w3.url} is down")
+        w3.reads += 1
+        return w3.url
+    return router.read(fn)
+
+
+class PinnedNodeDownTest(unittest.TestCase):
+    def test_reads_go_to_backups_without_touching_the_dead_node(self):
+        a, b, c = StandInNode("A", 11155111, up=False), StandInNode("B", 11155111), StandInNode("C", 11155111)
+        router = make_router([a, b, c])
+
+        self.assertEqual(router.chain_id, 11155111)
+        for _ in range(20):
+            self.assertIn(read_url(router), ("B", "C"))
+        self.assertEqual(a.reads, 0)
+        self.assertEqual(a.chain_id_calls, 1)  # only the startup check; rechecks run in the background
+        self.assertEqual(b.reads + c.reads, 20)
+
+    def test_backup_on_another_chain_is_ignored(self):
+        a, b, c = StandInNode("A", 1, up=False), StandInNode("B", 11155111), StandInNode("C", 1)
+        router = make_router([a, b, c], chain_id=11155111)
+
+        for _ in range(10):
+            self.assertEqual(read_url(router), "B")
+        self.assertFalse(router.endpoints[2].chain_ok)
+        self.assertEqual(c.reads, 0)
+
+    def test_pinned_node_is_rechecked_once_it_is_back(self):
+        a, b = StandInNode("A", 11155111, up=False), StandInNode("B", 11155111)
+        router = make_router([a, b])
+        self.assertIsNone(router.endpoints[0].chain_ok)
+
+        a.up = True
+        self.assertTrue(router.check_chains())
+        self.assertTrue(router.endpoints[0].chain_ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,330 @@
+import os
+import json
+import mmap
+import time
+import struct
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process lock only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# --------------------------
+# Configuration
+# --------------------------
+
+JOURNAL_PATH = os.getenv("TX_JOURNAL_PATH", "journal/transactions")
+INITIAL_CAPACITY = 1 << 16
+MAX_LOAD = 0.7
+
+# Record layout (little endian), followed by the variable length fields:
+#   total_len, prev_voter_offset+1, timestamp, latency_ms,
+#   len(function), len(tx_id), len(voter), len(status), len(params_json)
+RECORD = struct.Struct("<IQdfHHHHI")
+
+# Index layout: header then `capacity` slots of (key_hash, record_offset+1)
+INDEX_MAGIC = b"TXIDX001"
+INDEX_HEADER = struct.Struct("<8sQQQ")  # magic, capacity, count, journal bytes indexed
+SLOT = struct.Struct("<QQ")
+
+
+def _key_hash(key):
+    h = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+    return h or 1  # 0 marks an empty slot
+
+
+# --------------------------
+# Memory-mapped hash index
+# --------------------------
+
+class _HashIndex:
+    """Open-addressing hash table in a memory-mapped file.
+
+    Slots only hold a key hash and a journal offset; the caller passes a
+    `match(offset)` check so hash collisions are resolved against the record.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._inode = None
+        if not os.path.exists(path):
+            self._create(path, INITIAL_CAPACITY)
+        self._open()
+
+    @staticmethod
+    def _create(path, capacity, covered=0):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, capacity, 0, covered))
+            f.truncate(INDEX_HEADER.size + capacity * SLOT.size)
+        os.replace(tmp, path)
+
+    def _open(self):
+        self.close()
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        magic, self.capacity, _, _ = INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"Not a transaction index: {self.path}")
+
+    def refresh(self):
+        """Remap if another process replaced the file while growing it"""
+        if os.stat(self.path).st_ino != self._inode:
+            self._open()
+
+    @property
+    def count(self):
+        return INDEX_HEADER.unpack_from(self._map, 0)[2]
+
+    @property
+    def covered(self):
+        return INDEX_HEADER.unpack_from(self._map, 0)[3]
+
+    def _set_header(self, count, covered):
+        INDEX_HEADER.pack_into(self._map, 0, INDEX_MAGIC, self.capacity, count, covered)
+
+    def set_covered(self, covered):
+        self._set_header(self.count, covered)
+
+    def _slots(self, h):
+        i = h % self.capacity
+        while True:
+            pos = INDEX_HEADER.size + i * SLOT.size
+            yield pos, SLOT.unpack_from(self._map, pos)
+            i = (i + 1) % self.capacity
+
+    def get(self, h, match):
+        for _, (slot_hash, value) in self._slots(h):
+            if slot_hash == 0 or value == 0:
+                return None
+            if slot_hash == h and match(value - 1):
+                return value - 1
+
+    def put(self, h, offset, match):
+        """Insert or overwrite; returns the offset previously stored for the key"""
+        for pos, (slot_hash, value) in self._slots(h):
+            if slot_hash == 0:
+                SLOT.pack_into(self._map, pos, h, offset + 1)
+                self._set_header(self.count + 1, self.covered)
+                return None
+            if slot_hash == h and match(value - 1):
+                SLOT.pack_into(self._map, pos, h, offset + 1)
+                return value - 1
+
+    def needs_growth(self):
+        return self.count + 1 > self.capacity * MAX_LOAD
+
+    def reset(self, capacity):
+        """Replace with an empty index of `capacity` slots"""
+        self.close()
+        self._create(self.path, capacity)
+        self._open()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+
+# --------------------------
+# Transaction Journal
+# --------------------------
+
+class TransactionJournal:
+    """Append-only binary journal of submitted contract transactions.
+
+    Records are never rewritten. Two memory-mapped indexes give O(1)
+    lookup by transaction id and by voter; records of the same voter are
+    chained backwards through `prev_voter_offset`.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = os.open(f"{path}.log", os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self._tx_index = _HashIndex(f"{path}.txidx")
+        self._voter_index = _HashIndex(f"{path}.voteridx")
+        with self._locked():
+            self._catch_up()
+
+    # ---- locking ----
+
+    @contextmanager
+    def _locked(self):
+        """Serialize writers across threads and gunicorn workers"""
+        with self._lock:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    # ---- record io ----
+
+    def _read_header(self, offset):
+        return RECORD.unpack(os.pread(self._fd, RECORD.size, offset))
+
+    def _read(self, offset):
+        total, prev, ts, latency, fn_len, tx_len, voter_len, status_len, params_len = self._read_header(offset)
+        body = os.pread(self._fd, total - RECORD.size, offset + RECORD.size)
+        fields, pos = [], 0
+        for length in (fn_len, tx_len, voter_len, status_len, params_len):
+            fields.append(body[pos:pos + length].decode())
+            pos += length
+        function, tx_id, voter, status, params = fields
+        return {
+            "offset": offset,
+            "function": function,
+            "params": json.loads(params) if params else None,
+            "voter": voter or None,
+            "tx_id": tx_id or None,
+            "status": status,
+            "latency_ms": round(latency, 3),
+            "timestamp": ts,
+            "_prev_voter": prev - 1 if prev else None,
+        }
+
+    def _read_key(self, offset, field):
+        total, _, _, _, fn_len, tx_len, voter_len, _, _ = self._read_header(offset)
+        start = offset + RECORD.size + fn_len
+        if field == "voter":
+            start += tx_len
+            return os.pread(self._fd, voter_len, start).decode()
+        return os.pread(self._fd, tx_len, start).decode()
+
+    def _scan(self, start=0):
+        end = os.fstat(self._fd).st_size
+        offset = start
+        while offset + RECORD.size <= end:
+            header = self._read_header(offset)
+            total = header[0]
+            # A torn or zero-filled tail: stop here, append() truncates it
+            if total < RECORD.size or offset + total > end or RECORD.size + sum(header[4:]) > total:
+                break
+            yield offset, total
+            offset += total
+
+    # ---- indexing ----
+
+    def _index(self, offset):
+        """Add one record to both indexes"""
+        tx_id = self._read_key(offset, "tx_id")
+        voter = self._read_key(offset, "voter")
+        if tx_id:
+            self._tx_index.put(_key_hash(tx_id), offset,
+                               lambda o: self._read_key(o, "tx_id") == tx_id)
+        if voter:
+            self._voter_index.put(_key_hash(voter), offset,
+                                  lambda o: self._read_key(o, "voter") == voter)
+
+    def _grow(self):
+        for index in (self._tx_index, self._voter_index):
+            index.reset(index.capacity * 2)
+        self._catch_up()
+
+    def _catch_up(self):
+        """Index records appended by crashed or other writers"""
+        self._tx_index.refresh()
+        self._voter_index.refresh()
+        start = min(self._tx_index.covered, self._voter_index.covered)
+        for offset, total in self._scan(start):
+            if self._tx_index.needs_growth() or self._voter_index.needs_growth():
+                return self._grow()
+            self._index(offset)
+            self._tx_index.set_covered(offset + total)
+            self._voter_index.set_covered(offset + total)
+
+    # ---- public API ----
+
+    def append(self, function, params=None, voter=None, tx_id=None, status="UNKNOWN", latency_ms=0.0):
+        """Append one transaction record and index it"""
+        voter = (voter or "").lower()
+        fields = [
+            function.encode(), (tx_id or "").encode(), voter.encode(),
+            status.encode(), json.dumps(params, separators=(",", ":"), default=str).encode() if params is not None else b"",
+        ]
+        with self._locked():
+            self._catch_up()
+            if os.fstat(self._fd).st_size > self._tx_index.covered:
+                # Drop a record torn by a crashed writer before appending after it
+                os.ftruncate(self._fd, self._tx_index.covered)
+            prev = None
+            if voter:
+                prev = self._voter_index.get(_key_hash(voter), lambda o: self._read_key(o, "voter") == voter)
+            total = RECORD.size + sum(len(f) for f in fields)
+            header = RECORD.pack(total, prev + 1 if prev is not None else 0, time.time(), latency_ms,
+                                 *(len(f) for f in fields))
+            offset = os.fstat(self._fd).st_size
+            os.write(self._fd, header + b"".join(fields))
+            self._catch_up()
+        return offset
+
+    def _lookup(self, index, key, field):
+        # The in-process lock keeps _grow() from remapping the index under us;
+        # records themselves are append-only and safe to pread without it
+        with self._lock:
+            index.refresh()
+            return index.get(_key_hash(key), lambda o: self._read_key(o, field) == key)
+
+    def get(self, tx_id):
+        """Look up a record by transaction id"""
+        offset = self._lookup(self._tx_index, tx_id, "tx_id")
+        return self._public(self._read(offset)) if offset is not None else None
+
+    def by_voter(self, voter, limit=100):
+        """Records submitted for `voter`, newest first"""
+        offset = self._lookup(self._voter_index, voter.lower(), "voter")
+        records = []
+        while offset is not None and len(records) < limit:
+            record = self._read(offset)
+            offset = record["_prev_voter"]
+            records.append(self._public(record))
+        return records
+
+    def __iter__(self):
+        for offset, _ in self._scan():
+            yield self._public(self._read(offset))
+
+    @staticmethod
+    def _public(record):
+        record.pop("_prev_voter", None)
+        return record
+
+    def close(self):
+        self._tx_index.close()
+        self._voter_index.close()
+        os.close(self._fd)
+
+
+_journal = None
+
+
+def get_journal():
+    """Process-wide journal, opened lazily"""
+    global _journal
+    if _journal is None:
+        _journal = TransactionJournal()
+    return _journal
+
+
+def record_transaction(function, params=None, voter=None, tx_id=None, status="UNKNOWN", latency_ms=0.0):
+    """Journal a transaction without ever failing the caller"""
+    try:
+        get_journal().append(function, params, voter, tx_id, status, latency_ms)
+    except Exception as e:
+        logger.error(f"❌ Failed to journal {function} TX {tx_id}: {str(e)}")